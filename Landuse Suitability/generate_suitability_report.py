@@ -1,10 +1,53 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
+import itertools
+import os
+import sys
+
 import geopandas as gpd
 import pandas as pd
 import folium
-from shapely.geometry import Point, Polygon
+from folium.utilities import JsCode
+from shapely.geometry import Point, Polygon, box
 import numpy as np
+import shapely
+import rasterio
+from rasterio.features import rasterize
+from rasterio.windows import Window, bounds as window_bounds, transform as window_transform
 from jinja2 import Template
 
+# The shared instrumentation module lives at the repository root. Run as a script, this
+# module puts the root on the path itself; when imported without it, stages are no-ops.
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from instrumentation import stage
+except ImportError:
+    class _NoOpStage:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    def stage(name):
+        return _NoOpStage()
+
+# Criterion weights shared by the parcel and raster scoring modes
+SUITABILITY_WEIGHTS = {'pop_density_norm': 0.4, 'slope_norm': 0.3, 'proximity_score_norm': 0.3}
+
+# Raster criteria: weight key and whether lower raw values are better
+RASTER_CRITERIA = {
+    'pop_density': {'weight': 'pop_density_norm', 'invert': False},
+    'slope': {'weight': 'slope_norm', 'invert': True},               # Lower slope is better
+    'transit_distance': {'weight': 'proximity_score_norm', 'invert': True}  # Closer to transit is better
+}
+
+RASTER_NODATA = -9999
+
+REPORT_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dynamic_report_generation.html')
+
 # Sample data creation for San Francisco with land boundary check
 def create_sample_data():
     # Approximate San Francisco land boundary as a polygon (simplified, in EPSG:4326)
@@ -79,8 +122,8 @@ def normalize_series(series):
         return pd.Series([0.5] * len(series), index=series.index)
     return (series - series.min()) / (series.max() - series.min())
 
-# Calculate land use suitability for urban development
-def calculate_suitability(parcels):
+# Normalize the suitability criteria to 0-1 (higher is better)
+def normalize_criteria(parcels):
     parcels['pop_density_norm'] = normalize_series(parcels['pop_density'])
     parcels['slope_norm'] = 1 - normalize_series(parcels['slope'])  # Lower slope is better
     parcels['proximity_score_norm'] = normalize_series(parcels['proximity_score'])
@@ -90,7 +133,12 @@ def calculate_suitability(parcels):
             print(f"Warning: NaN values detected in {col}. Replacing with 0.5.")
             parcels[col] = parcels[col].fillna(0.5)
     
-    weights = {'pop_density_norm': 0.4, 'slope_norm': 0.3, 'proximity_score_norm': 0.3}
+    return parcels
+
+# Calculate land use suitability for urban development
+def calculate_suitability(parcels):
+    parcels = normalize_criteria(parcels)
+    weights = SUITABILITY_WEIGHTS
     parcels['suitability_score'] = (
         parcels['pop_density_norm'] * weights['pop_density_norm'] +
         parcels['slope_norm'] * weights['slope_norm'] +
@@ -103,6 +151,363 @@ def calculate_suitability(parcels):
     
     return parcels
 
+# Weight scenarios sampled over the simplex, as a (criteria x scenarios) matrix
+def generate_weight_scenarios(n_scenarios=1000, method='monte_carlo', step=0.1, seed=None):
+    n_criteria = len(SUITABILITY_WEIGHTS)
+    if method == 'monte_carlo':
+        rng = np.random.default_rng(seed)
+        return rng.dirichlet(np.ones(n_criteria), size=n_scenarios).T
+    if method == 'grid':
+        # Stars and bars: every split of 1/step units over the criteria
+        units = int(round(1 / step))
+        scenarios = []
+        for bars in itertools.combinations(range(units + n_criteria - 1), n_criteria - 1):
+            edges = (-1,) + bars + (units + n_criteria - 1,)
+            scenarios.append([edges[i + 1] - edges[i] - 1 for i in range(n_criteria)])
+        return np.array(scenarios, dtype='float64').T / units
+    raise ValueError(f"Unknown scenario method '{method}'. Use 'monte_carlo' or 'grid'.")
+
+# Convert weight dicts or a (criteria x scenarios) array into normalized weight columns
+def weight_scenario_matrix(scenarios):
+    if isinstance(scenarios, np.ndarray):
+        weights = scenarios.astype('float64')
+    else:
+        weights = np.array([[s.get(col, 0) for s in scenarios] for col in SUITABILITY_WEIGHTS], dtype='float64')
+    if weights.ndim != 2 or weights.shape[0] != len(SUITABILITY_WEIGHTS):
+        raise ValueError(f"Weight scenarios must have one row per criterion: {list(SUITABILITY_WEIGHTS)}.")
+    totals = weights.sum(axis=0)
+    if (totals <= 0).any():
+        raise ValueError("Every weight scenario needs a positive total weight.")
+    return weights / totals
+
+# Score all parcels under many weight scenarios, chunked over the scenario axis
+def sweep_weight_scenarios(parcels, scenarios=None, top_fraction=0.2, max_chunk_bytes=256 * 2**20):
+    if scenarios is None:
+        scenarios = generate_weight_scenarios()
+    weights = weight_scenario_matrix(scenarios)
+    if not set(SUITABILITY_WEIGHTS).issubset(parcels.columns):
+        parcels = normalize_criteria(parcels.copy())
+    criteria = parcels[list(SUITABILITY_WEIGHTS)].to_numpy(dtype='float64')
+    n_parcels, n_scenarios = len(criteria), weights.shape[1]
+    top_n = max(1, int(np.ceil(top_fraction * n_parcels)))
+
+    # Running per-parcel statistics, so memory only depends on the chunk size
+    score_min = np.full(n_parcels, np.inf)
+    score_max = np.full(n_parcels, -np.inf)
+    score_sum = np.zeros(n_parcels)
+    score_sq_sum = np.zeros(n_parcels)
+    top_count = np.zeros(n_parcels)
+    score_weight_sum = np.zeros((n_parcels, len(SUITABILITY_WEIGHTS)))
+
+    # Reused scenario-major buffers, so each chunk's rows are contiguous views:
+    # float64 scores, float64 scratch (squares, partition, tie credit) and a bool mask
+    chunk_size = max(1, min(n_scenarios, int(max_chunk_bytes // (17 * max(n_parcels, 1)))))
+    scores_buf = np.empty((chunk_size, n_parcels))
+    work_buf = np.empty((chunk_size, n_parcels))
+    mask_buf = np.empty((chunk_size, n_parcels), dtype=bool)
+
+    for start in range(0, n_scenarios, chunk_size):
+        chunk = weights[:, start:start + chunk_size]
+        size = chunk.shape[1]
+        scores, work, mask = scores_buf[:size], work_buf[:size], mask_buf[:size]
+        np.matmul(chunk.T, criteria.T, out=scores)  # (scenarios x parcels)
+
+        score_min = np.minimum(score_min, scores.min(axis=0))
+        score_max = np.maximum(score_max, scores.max(axis=0))
+        score_sum += scores.sum(axis=0)
+        score_sq_sum += np.square(scores, out=work).sum(axis=0)
+        score_weight_sum += scores.T @ chunk.T
+
+        # A parcel is "top" in a scenario when it scores within the best top_n parcels
+        np.copyto(work, scores)
+        work.partition(n_parcels - top_n, axis=1)
+        threshold = work[:, n_parcels - top_n].copy()[:, None]
+        top_count += np.greater(scores, threshold, out=mask).sum(axis=0)
+        above = mask.sum(axis=1)
+        # Parcels tied at the threshold share the remaining top places equally,
+        # so every scenario credits exactly top_n parcels in total
+        np.equal(scores, threshold, out=mask)
+        tie_share = (top_n - above) / mask.sum(axis=1)
+        top_count += np.multiply(mask, tie_share[:, None], out=work).sum(axis=0)
+
+    score_mean = score_sum / n_scenarios
+    score_var = np.maximum(score_sq_sum / n_scenarios - score_mean ** 2, 0)
+    weight_mean = weights.mean(axis=1)
+    weight_var = weights.var(axis=1)
+
+    # Per-parcel covariance between each criterion weight and the score
+    covariance = score_weight_sum / n_scenarios - np.outer(score_mean, weight_mean)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = covariance / np.sqrt(np.outer(score_var, weight_var))
+        slope = covariance / weight_var
+    # Parcels whose score barely moves have no meaningful correlation
+    correlation[score_var < 1e-12] = 0
+    correlation = np.clip(np.nan_to_num(correlation), -1, 1)
+    slope = np.nan_to_num(slope)
+
+    summary = parcels[['id']].copy() if 'id' in parcels else pd.DataFrame(index=parcels.index)
+    summary['score_min'] = score_min
+    summary['score_max'] = score_max
+    summary['score_range'] = score_max - score_min
+    summary['score_mean'] = score_mean
+    summary['score_std'] = np.sqrt(score_var)
+    # Rank stability: share of scenarios in the top_fraction (ties split the places); near 0 or 1 is stable
+    summary['top_share'] = top_count / n_scenarios
+    for i, col in enumerate(SUITABILITY_WEIGHTS):
+        summary[f'sensitivity_{col}'] = correlation[:, i]
+
+    sensitivity = pd.DataFrame({
+        'criterion': list(SUITABILITY_WEIGHTS),
+        'mean_abs_correlation': np.abs(correlation).mean(axis=0),
+        'mean_score_per_weight': slope.mean(axis=0),
+        'weight_min': weights.min(axis=1),
+        'weight_max': weights.max(axis=1)
+    })
+    return summary, sensitivity
+
+# Split a raster grid into square tile windows
+def iter_tile_windows(width, height, tile_size=512):
+    for row_off in range(0, height, tile_size):
+        for col_off in range(0, width, tile_size):
+            yield Window(col_off, row_off,
+                         min(tile_size, width - col_off),
+                         min(tile_size, height - row_off))
+
+# Check that all criterion rasters share the same grid
+def check_raster_alignment(raster_paths):
+    grid = None
+    for name, path in raster_paths.items():
+        with rasterio.open(path) as src:
+            current = (src.crs, src.transform, src.width, src.height)
+        if grid is None:
+            grid = current
+            reference = name
+        elif current != grid:
+            raise ValueError(f"Criterion raster '{name}' is not aligned with '{reference}' (CRS, transform and shape must match).")
+    return grid
+
+# Min/max of the valid pixels of one tile for every criterion
+def _tile_min_max(raster_paths, window):
+    tile_bounds = {}
+    for name, path in raster_paths.items():
+        with rasterio.open(path) as src:
+            values = src.read(1, window=window, masked=True).astype('float64')
+        values = np.ma.masked_invalid(values).compressed()
+        tile_bounds[name] = (values.min(), values.max()) if values.size else None
+    return tile_bounds
+
+# First pass: global min/max per criterion, gathered tile by tile
+def compute_raster_bounds(raster_paths, tile_size=512, max_workers=None):
+    _, _, width, height = check_raster_alignment(raster_paths)
+    bounds = {name: [np.inf, -np.inf] for name in raster_paths}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_tile_min_max, raster_paths, window)
+                   for window in iter_tile_windows(width, height, tile_size)]
+        for future in as_completed(futures):
+            for name, tile_range in future.result().items():
+                if tile_range is not None:
+                    bounds[name][0] = min(bounds[name][0], tile_range[0])
+                    bounds[name][1] = max(bounds[name][1], tile_range[1])
+
+    for name, (vmin, vmax) in bounds.items():
+        if not np.isfinite(vmin):
+            raise ValueError(f"Criterion raster '{name}' has no valid pixels.")
+    return {name: tuple(value) for name, value in bounds.items()}
+
+# Normalize one criterion tile with the global bounds (same rules as normalize_series)
+def normalize_array(values, vmin, vmax, invert=False, clip=False):
+    if vmax == vmin:
+        norm = np.full(values.shape, 0.5)
+    else:
+        norm = (values - vmin) / (vmax - vmin)
+    if clip:  # Values outside externally fixed bounds
+        norm = np.clip(norm, 0, 1)
+    return 1 - norm if invert else norm
+
+# Weighted sum of the normalized criteria for one tile
+def _score_tile(raster_paths, bounds, weights, window):
+    score = np.zeros((int(window.height), int(window.width)), dtype='float64')
+    valid = np.zeros(score.shape, dtype=bool)
+
+    for name, path in raster_paths.items():
+        with rasterio.open(path) as src:
+            values = src.read(1, window=window, masked=True).astype('float64')
+        values = np.ma.masked_invalid(values)
+        criterion = RASTER_CRITERIA[name]
+        norm = normalize_array(values.filled(np.nan), *bounds[name], invert=criterion['invert'])
+        missing = np.ma.getmaskarray(values)
+        valid |= ~missing
+        # Pixels missing a single criterion get the neutral 0.5, as in calculate_suitability
+        score += np.where(missing, 0.5, norm) * weights[criterion['weight']]
+
+    return window, np.where(valid, score, RASTER_NODATA).astype('float32')
+
+# Calculate land use suitability over aligned criterion rasters and write a GeoTIFF
+def calculate_raster_suitability(raster_paths, output_path, weights=None, tile_size=512, max_workers=None):
+    unknown = set(raster_paths) - set(RASTER_CRITERIA)
+    if unknown:
+        raise ValueError(f"Unknown raster criteria: {sorted(unknown)}. Expected any of {sorted(RASTER_CRITERIA)}.")
+    if tile_size % 16:
+        raise ValueError("tile_size must be a multiple of 16 for a tiled GeoTIFF.")
+    weights = weights or SUITABILITY_WEIGHTS
+    # Rescale the weights of the supplied criteria so scores stay within 0-1
+    total = sum(weights[RASTER_CRITERIA[name]['weight']] for name in raster_paths)
+    weights = {key: value / total for key, value in weights.items()}
+
+    bounds = compute_raster_bounds(raster_paths, tile_size, max_workers)
+    crs, transform, width, height = check_raster_alignment(raster_paths)
+
+    profile = {
+        'driver': 'GTiff', 'dtype': 'float32', 'count': 1, 'nodata': RASTER_NODATA,
+        'crs': crs, 'transform': transform, 'width': width, 'height': height,
+        'tiled': True, 'blockxsize': tile_size, 'blockysize': tile_size, 'compress': 'deflate'
+    }
+
+    windows = iter_tile_windows(width, height, tile_size)
+    with rasterio.open(output_path, 'w', **profile) as dst, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Keep a bounded number of tiles in flight; writes stay on this thread
+        in_flight = 2 * (max_workers or os.cpu_count() or 1)
+        pending = set()
+        for window in windows:
+            pending.add(executor.submit(_score_tile, raster_paths, bounds, weights, window))
+            if len(pending) >= in_flight:
+                future = next(as_completed(pending))
+                pending.remove(future)
+                tile_window, tile_score = future.result()
+                dst.write(tile_score, 1, window=tile_window)
+        for future in as_completed(pending):
+            tile_window, tile_score = future.result()
+            dst.write(tile_score, 1, window=tile_window)
+
+    print(f"Suitability raster saved as {output_path}")
+    return bounds
+
+# Per-tile sums and counts of valid pixels, plus pixels covered, for the parcels intersecting the tile
+def _zonal_tile(raster_path, parcels, window, transform, all_touched=False):
+    with rasterio.open(raster_path) as src:
+        values = src.read(1, window=window, masked=True)
+
+    tile_transform = window_transform(window, transform)
+    candidates = parcels.iloc[parcels.sindex.query(box(*window_bounds(window, transform)))]
+    if candidates.empty:
+        return None
+
+    # Label pixels by position among the candidates (+1 so 0 means "no parcel"), so the
+    # per-tile arrays scale with the parcels in this tile, not with all parcels
+    size = len(candidates) + 1
+    labels_of = np.arange(1, size)
+    sums = np.zeros(size)
+    counts = np.zeros(size)
+    covered = np.zeros(size)
+    missing = np.ma.getmaskarray(values).ravel()
+    weights = values.filled(0).ravel()
+    # Overlapping parcels sit in different layers, so each one keeps all of its pixels
+    for _, positions in candidates.groupby('_layer').indices.items():
+        labels = rasterize(
+            zip(candidates.geometry.iloc[positions], labels_of[positions]),
+            out_shape=values.shape, transform=tile_transform, fill=0, dtype='int32',
+            all_touched=all_touched
+        ).ravel()
+        covered += np.bincount(labels, minlength=size)
+        labels[missing] = 0
+        sums += np.bincount(labels, weights=weights, minlength=size)
+        counts += np.bincount(labels, minlength=size)
+    return candidates['_zone'].to_numpy(), sums[1:], counts[1:], covered[1:]
+
+# Group parcels into layers in which no two parcels share a pixel (greedy colouring). Pixel
+# centres go to one parcel unless parcels overlap; with all_touched, edge neighbours share pixels too
+def _overlap_layers(zones, all_touched=False):
+    predicates = ('intersects',) if all_touched else ('overlaps', 'contains', 'within')
+    pairs = [zones.sindex.query(zones.geometry, predicate=predicate) for predicate in predicates]
+    left = np.concatenate([pair[0] for pair in pairs])
+    right = np.concatenate([pair[1] for pair in pairs])
+    keep = left != right
+    layers = np.zeros(len(zones), dtype='int64')
+
+    neighbours = {}
+    for i, j in zip(left[keep], right[keep]):
+        neighbours.setdefault(i, set()).add(j)
+    for i in sorted(neighbours):
+        taken = {layers[j] for j in neighbours[i] if j < i}
+        layers[i] = next(layer for layer in itertools.count() if layer not in taken)
+    return layers
+
+# Aggregate a suitability raster back to parcels (mean score per parcel)
+def aggregate_raster_to_parcels(parcels, raster_path, tile_size=512, max_workers=None, all_touched=False):
+    with rasterio.open(raster_path) as src:
+        crs, transform, width, height = src.crs, src.transform, src.width, src.height
+
+    zones = parcels.to_crs(crs) if parcels.crs != crs else parcels
+    zones = zones[['geometry']].reset_index(drop=True)
+    zones['_zone'] = np.arange(len(zones))
+    zones.sindex  # Build the spatial index once, before worker threads query it
+    zones['_layer'] = _overlap_layers(zones, all_touched)
+
+    sums = np.zeros(len(zones))
+    counts = np.zeros(len(zones))
+    covered = np.zeros(len(zones))
+
+    def add_tile(result):
+        if result is not None:
+            zone, tile_sums, tile_counts, tile_covered = result
+            np.add.at(sums, zone, tile_sums)
+            np.add.at(counts, zone, tile_counts)
+            np.add.at(covered, zone, tile_covered)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Keep a bounded number of tiles in flight, as in calculate_raster_suitability
+        in_flight = 2 * (max_workers or os.cpu_count() or 1)
+        pending = set()
+        for window in iter_tile_windows(width, height, tile_size):
+            pending.add(executor.submit(_zonal_tile, raster_path, zones, window, transform, all_touched))
+            if len(pending) >= in_flight:
+                future = next(as_completed(pending))
+                pending.remove(future)
+                add_tile(future.result())
+        for future in as_completed(pending):
+            add_tile(future.result())
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+
+    # Parcels smaller than a pixel cover no pixel centre: sample the pixel under an interior point
+    uncovered = np.flatnonzero(covered == 0)
+    if len(uncovered):
+        points = zones.geometry.iloc[uncovered].representative_point()
+        with rasterio.open(raster_path) as src:
+            sampled = np.ma.concatenate(list(src.sample(zip(points.x, points.y), indexes=1, masked=True)))
+        means[uncovered] = sampled.astype('float64').filled(np.nan)
+        print(f"Note: {len(uncovered)} parcels cover no pixel centre; sampled the pixel at an interior point instead.")
+
+    parcels = parcels.copy()
+    parcels['suitability_score'] = means
+    if parcels['suitability_score'].isna().any():
+        print(f"Warning: {parcels['suitability_score'].isna().sum()} parcels cover no valid suitability pixels.")
+    return parcels
+
+# Parcel styling evaluated in the browser from each feature's score (same 0.3/0.7 classes as the table)
+PARCEL_STYLE_JS = JsCode("""
+function(feature) {
+    var score = feature.properties.suitability_score;
+    return {
+        fillColor: score < 0.3 ? '#ff0000' : score < 0.7 ? '#ffa500' : '#008000',
+        color: 'black',
+        weight: 1,
+        fillOpacity: 0.6
+    };
+}
+""")
+
+# Compact GeoJSON for the parcel layer: only the mapped columns, coordinates rounded
+def parcels_to_geojson(parcels, precision=6):
+    layer = parcels[['id', 'suitability_score', 'pop_density', 'slope', 'geometry']].to_crs(epsg=4326)
+    layer = layer.reset_index(drop=True)
+    layer['suitability_score'] = layer['suitability_score'].round(2)
+    layer['geometry'] = shapely.transform(np.asarray(layer.geometry), lambda coords: np.round(coords, precision))
+    return layer.to_geo_dict(drop_id=True)  # A dict is embedded by folium without a second JSON round trip
+
 # Create interactive Folium map with reliable basemap
 def create_suitability_map(parcels, sf_boundary):
     m = folium.Map(
@@ -124,18 +529,16 @@ def create_suitability_map(parcels, sf_boundary):
         tooltip="San Francisco Boundary"
     ).add_to(m)
     
-    # Add parcels with suitability scores
-    for idx, row in parcels.iterrows():
-        folium.GeoJson(
-            row.geometry,
-            style_function=lambda x, score=row['suitability_score']: {
-                'fillColor': '#ff0000' if score < 0.3 else '#ffa500' if score < 0.7 else '#008000',
-                'color': 'black',
-                'weight': 1,
-                'fillOpacity': 0.6
-            },
-            tooltip=f"Suitability: {row['suitability_score']:.2f}, Pop Density: {row['pop_density']}, Slope: {row['slope']}°"
-        ).add_to(m)
+    # Add all parcels as one layer, styled by suitability score
+    folium.GeoJson(
+        parcels_to_geojson(parcels),
+        name="Parcels",
+        style=PARCEL_STYLE_JS,  # Passed to L.geoJson as-is, no per-feature style table
+        tooltip=folium.GeoJsonTooltip(
+            fields=['suitability_score', 'pop_density', 'slope'],
+            aliases=['Suitability:', 'Pop Density:', 'Slope (°):']
+        )
+    ).add_to(m)
     
     # Add layer control
     folium.LayerControl().add_to(m)
@@ -155,49 +558,174 @@ def create_suitability_map(parcels, sf_boundary):
     
     return m
 
-# Generate styled HTML table
-def generate_styled_table(parcels):
-    df = parcels[['id', 'pop_density', 'slope', 'proximity_score', 'suitability_score']].copy()
-    df = df.round(2)
-    
-    def color_suitability(val):
-        if val < 0.3:
-            return 'background-color: #ffcccc'
-        elif val < 0.7:
-            return 'background-color: #ffe4b5'
-        else:
-            return 'background-color: #ccffcc'
-    
-    styled_df = df.style.set_properties(**{
-        'text-align': 'center',
-        'border': '1px solid #ddd'
-    }).applymap(color_suitability, subset=['suitability_score']).to_html()
-    
-    return styled_df
+# Paginated table rendered client-side from embedded JSON rows
+TABLE_TEMPLATE = Template("""
+<div id="parcel-table">
+    <table>
+        <thead><tr>{% for col in columns %}<th>{{ col }}</th>{% endfor %}</tr></thead>
+        <tbody></tbody>
+    </table>
+    <div class="pager">
+        <button type="button" data-step="-1">&laquo; Prev</button>
+        <span class="page-info"></span>
+        <button type="button" data-step="1">Next &raquo;</button>
+    </div>
+</div>
+<script>
+(function() {
+    var data = {{ payload }};
+    var pageSize = {{ page_size }};
+    var scoreCol = data.columns.indexOf('suitability_score');
+    var root = document.getElementById('parcel-table');
+    var tbody = root.querySelector('tbody');
+    var info = root.querySelector('.page-info');
+    var pages = Math.max(1, Math.ceil(data.data.length / pageSize));
+    var page = 0;
+
+    function scoreClass(val) {
+        return val < 0.3 ? 'low' : val < 0.7 ? 'medium' : 'high';
+    }
+
+    function render() {
+        var rows = document.createDocumentFragment();
+        data.data.slice(page * pageSize, (page + 1) * pageSize).forEach(function(row) {
+            var tr = document.createElement('tr');
+            row.forEach(function(val, i) {
+                var td = document.createElement('td');
+                td.textContent = val === null ? '' : val;
+                if (i === scoreCol && val !== null) td.className = scoreClass(val);
+                tr.appendChild(td);
+            });
+            rows.appendChild(tr);
+        });
+        tbody.replaceChildren(rows);
+        info.textContent = 'Page ' + (page + 1) + ' of ' + pages + ' (' + data.data.length + ' parcels)';
+    }
+
+    root.querySelectorAll('.pager button').forEach(function(button) {
+        button.addEventListener('click', function() {
+            page = Math.min(pages - 1, Math.max(0, page + Number(button.dataset.step)));
+            render();
+        });
+    });
+    render();
+})();
+</script>
+""")
+
+# Generate paginated HTML table
+def generate_styled_table(parcels, page_size=50):
+    df = parcels[['id', 'pop_density', 'slope', 'proximity_score', 'suitability_score']].round(2)
+    # Escape "</" so the JSON cannot close the surrounding <script> tag
+    payload = df.to_json(orient='split', index=False).replace('</', '<\\/')
+    return TABLE_TEMPLATE.render(columns=list(df.columns), payload=payload, page_size=page_size)
+
+# Load the report template once; repeated reports reuse the compiled template
+@functools.lru_cache(maxsize=None)
+def load_report_template(path=REPORT_TEMPLATE_PATH):
+    with open(path, 'r') as f:
+        return Template(f.read())
+
+# Render the full HTML report (table + map) to output_path
+def write_suitability_report(parcels, sf_boundary, output_path, template_path=REPORT_TEMPLATE_PATH):
+    with stage('create_suitability_map') as s:
+        folium_map = create_suitability_map(parcels, sf_boundary)
+        s.rows = len(parcels)
+    with stage('generate_styled_table') as s:
+        table_html = generate_styled_table(parcels)
+        s.rows = len(parcels)
+
+    # Embed the map's header, body and script directly instead of an escaped iframe
+    with stage('render_template'):
+        root = folium_map.get_root()
+        root.render()
+        final_html = load_report_template(template_path).render(
+            table_html=table_html,
+            map_header=root.header.render(),
+            map_html=root.html.render(),
+            map_script=root.script.render()
+        )
+
+        with open(output_path, 'w') as f:
+            f.write(final_html)
+    return output_path
+
+# Command-line options
+def parse_args():
+    parser = argparse.ArgumentParser(description="Land use suitability report for San Francisco parcels or criterion rasters.")
+    raster = parser.add_argument_group("raster mode", "Weighted overlay of aligned criterion rasters")
+    raster.add_argument('--pop-density-raster', help="Population density raster")
+    raster.add_argument('--slope-raster', help="Slope raster (e.g. derived from a DEM)")
+    raster.add_argument('--transit-distance-raster', help="Distance-to-transit raster")
+    raster.add_argument('--output-raster', default='suitability.tif', help="Output suitability GeoTIFF")
+    raster.add_argument('--parcels', help="Optional parcel layer to aggregate the suitability raster to")
+    raster.add_argument('--tile-size', type=int, default=512, help="Tile size in pixels (multiple of 16)")
+    raster.add_argument('--workers', type=int, default=None, help="Number of worker threads")
+    raster.add_argument('--all-touched', action='store_true', help="Count every pixel a parcel touches, not only pixel centres")
+    sweep = parser.add_argument_group("weight sweep", "Sensitivity of parcel scores to the criterion weights")
+    sweep.add_argument('--weight-scenarios', type=int, default=0, help="Number of Monte Carlo weight scenarios (0 disables the sweep)")
+    sweep.add_argument('--scenario-method', choices=['monte_carlo', 'grid'], default='monte_carlo')
+    sweep.add_argument('--grid-step', type=float, default=0.1, help="Weight step for the grid method")
+    return parser.parse_args()
+
+# Raster mode: region-wide suitability GeoTIFF, optionally aggregated to parcels
+def run_raster_mode(args, raster_paths):
+    with stage('calculate_raster_suitability') as s:
+        calculate_raster_suitability(raster_paths, args.output_raster,
+                                     tile_size=args.tile_size, max_workers=args.workers)
+        with rasterio.open(args.output_raster) as src:
+            s.pixels = src.width * src.height
+    if args.parcels:
+        with stage('read_file') as s:
+            parcels = gpd.read_file(args.parcels)
+            s.rows = len(parcels)
+        with stage('aggregate_raster_to_parcels') as s:
+            parcels = aggregate_raster_to_parcels(parcels, args.output_raster, tile_size=args.tile_size,
+                                                  max_workers=args.workers, all_touched=args.all_touched)
+            s.rows = len(parcels)
+        output_parcels = os.path.splitext(args.output_raster)[0] + '_parcels.geojson'
+        with stage('to_file') as s:
+            parcels.to_file(output_parcels, driver='GeoJSON')
+            s.rows = len(parcels)
+        print(f"Parcel suitability saved as {output_parcels}")
 
 # Main execution
 if __name__ == "__main__":
-    # Create or load sample data
-    transit, parcels, sf_boundary = create_sample_data()
-    
-    # Calculate proximity and suitability
-    parcels = calculate_proximity_to_transit(parcels, transit)
-    parcels = calculate_suitability(parcels)
-    
-    # Generate map and table
-    folium_map = create_suitability_map(parcels, sf_boundary)
-    table_html = generate_styled_table(parcels)
-    
-    # Load HTML template
-    with open('land_use_suitability_report.html', 'r') as f:
-        template = Template(f.read())
+    args = parse_args()
+    raster_paths = {
+        name: path for name, path in {
+            'pop_density': args.pop_density_raster,
+            'slope': args.slope_raster,
+            'transit_distance': args.transit_distance_raster
+        }.items() if path
+    }
+    if raster_paths:
+        run_raster_mode(args, raster_paths)
+    else:
+        # Create or load sample data
+        with stage('create_sample_data') as s:
+            transit, parcels, sf_boundary = create_sample_data()
+            s.rows = len(parcels)
     
-    # Render HTML with table and map
-    map_html = folium_map._repr_html_()
-    final_html = template.render(table_html=table_html, map_html=map_html)
+        # Calculate proximity and suitability
+        with stage('calculate_proximity_to_transit') as s:
+            parcels = calculate_proximity_to_transit(parcels, transit)
+            s.rows = len(parcels)
+        with stage('calculate_suitability') as s:
+            parcels = calculate_suitability(parcels)
+            s.rows = len(parcels)
     
-    # Save output
-    with open('suitability_report_san_francisco.html', 'w') as f:
-        f.write(final_html)
+        # Optional weight-scenario sweep
+        if args.weight_scenarios or args.scenario_method == 'grid':
+            with stage('sweep_weight_scenarios') as s:
+                scenarios = generate_weight_scenarios(args.weight_scenarios, args.scenario_method, args.grid_step)
+                summary, sensitivity = sweep_weight_scenarios(parcels, scenarios)
+                s.rows = len(parcels) * scenarios.shape[1]
+            summary.to_csv('suitability_weight_sweep.csv', index=False)
+            print(sensitivity.to_string(index=False))
+            print("Weight sweep saved as suitability_weight_sweep.csv")
     
-    print("Report saved as suitability_report_san_francisco.html")
+        # Generate map and table, render and save the report
+        with stage('write_suitability_report'):
+            write_suitability_report(parcels, sf_boundary, 'suitability_report_san_francisco.html')
+        print("Report saved as suitability_report_san_francisco.html")
@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import time
+
+import geopandas as gpd
+import numpy as np
+
+from generate_suitability_report import (
+    SUITABILITY_WEIGHTS, create_sample_data, normalize_array
+)
+
+# Layers, spatial indexes and normalization bounds, loaded once per worker process
+_context = None
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+# Load transit, boundary and reference criterion layers and precompute everything reusable
+def load_context(transit_path=None, boundary_path=None, reference_path=None, buffer_distance=0.005):
+    transit, reference, boundary = create_sample_data()
+    if transit_path:
+        transit = gpd.read_file(transit_path)
+    if boundary_path:
+        boundary = gpd.read_file(boundary_path)
+    if reference_path:
+        reference = gpd.read_file(reference_path)
+    # Every layer works in the transit CRS, including the sample defaults
+    boundary = boundary.to_crs(transit.crs)
+    reference = reference.to_crs(transit.crs)
+
+    transit_buffers = gpd.GeoDataFrame(geometry=transit.buffer(buffer_distance), crs=transit.crs)
+    transit_buffers.sindex  # Build the spatial index up front, not on the first request
+
+    # Normalization bounds come from the reference layer so ad-hoc parcel sets score consistently;
+    # proximity only ever takes the values 0.5 and 1, so its bounds are fixed
+    bounds = {col: (float(reference[col].min()), float(reference[col].max()))
+              for col in ['pop_density', 'slope']}
+    bounds['proximity_score'] = (0.5, 1.0)
+
+    return {
+        'crs': transit.crs,
+        'transit_buffers': transit_buffers,
+        'boundary': boundary.geometry.union_all(),
+        'bounds': bounds
+    }
+
+# Worker process initializer
+def init_worker(transit_path, boundary_path, reference_path, buffer_distance):
+    global _context
+    _context = load_context(transit_path, boundary_path, reference_path, buffer_distance)
+
+# Score a GeoJSON FeatureCollection of parcels against the loaded context
+def score_parcels(parcels, context):
+    missing = {'pop_density', 'slope'} - set(parcels.columns)
+    if missing:
+        raise ValueError(f"Parcels are missing required properties: {sorted(missing)}")
+    parcels = parcels.to_crs(context['crs'])
+
+    # Same rule as calculate_proximity_to_transit: 1 inside a transit buffer, 0.5 otherwise
+    inside, _ = context['transit_buffers'].sindex.query(parcels.geometry, predicate='within')
+    proximity = np.full(len(parcels), 0.5)
+    proximity[inside] = 1
+    parcels['proximity_score'] = proximity
+
+    bounds = context['bounds']
+    norms = {
+        'pop_density_norm': normalize_array(parcels['pop_density'].to_numpy(dtype='float64'),
+                                            *bounds['pop_density'], clip=True),
+        'slope_norm': normalize_array(parcels['slope'].to_numpy(dtype='float64'),
+                                      *bounds['slope'], invert=True, clip=True),
+        'proximity_score_norm': normalize_array(proximity, *bounds['proximity_score'], clip=True)
+    }
+    score = sum(np.nan_to_num(norms[col], nan=0.5) * weight for col, weight in SUITABILITY_WEIGHTS.items())
+    parcels['suitability_score'] = np.round(score, 4)
+    parcels['in_boundary'] = parcels.geometry.within(context['boundary'])
+    return parcels
+
+# Worker entry point: raw request body in, raw response body out
+def score_geojson(body):
+    collection = json.loads(body)
+    if (not isinstance(collection, dict) or collection.get('type') != 'FeatureCollection'
+            or not isinstance(collection.get('features'), list) or not collection['features']):
+        raise ValueError("Expected a non-empty GeoJSON FeatureCollection")
+    if not all(isinstance(feature, dict) and isinstance(feature.get('properties'), dict)
+               for feature in collection['features']):
+        raise ValueError("Every feature must be an object with a properties object")
+    try:
+        parcels = gpd.GeoDataFrame.from_features(collection['features'], crs='EPSG:4326')
+    except Exception as e:  # Missing or invalid geometries, among others
+        raise ValueError(f"Invalid GeoJSON features: {e}") from e
+    if parcels.geometry.isna().any():
+        raise ValueError("Every feature needs a geometry")
+    parcels = score_parcels(parcels, _context)
+    return parcels.to_crs(epsg=4326).to_json(drop_id=True).encode(), len(parcels)
+
+# Request counters, a rolling latency window and the completion times of the last 60 s
+class ServiceMetrics:
+    def __init__(self, window=1000, rate_window=60):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.parcels = 0
+        self.latencies = deque(maxlen=window)
+        self.rate_window = rate_window
+        self.finished = deque()
+
+    def _drop_old(self, now):
+        while self.finished and now - self.finished[0] > self.rate_window:
+            self.finished.popleft()
+
+    def record(self, latency, parcels=0, error=False):
+        now = time.monotonic()
+        self.requests += 1
+        self.errors += error
+        self.parcels += parcels
+        self.latencies.append(latency)
+        self.finished.append(now)
+        self._drop_old(now)
+
+    def snapshot(self):
+        now = time.monotonic()
+        uptime = now - self.started
+        self._drop_old(now)
+        latencies_ms = np.array(self.latencies) * 1000
+        percentiles = (
+            dict(zip(['p50', 'p95', 'p99'], np.round(np.percentile(latencies_ms, [50, 95, 99]), 2).tolist()))
+            if len(latencies_ms) else {}
+        )
+        return {
+            'uptime_s': round(uptime, 1),
+            'requests': self.requests,
+            'errors': self.errors,
+            'parcels_scored': self.parcels,
+            'throughput_rps': round(self.requests / uptime, 3) if uptime else 0,
+            'throughput_rps_last_60s': round(len(self.finished) / min(uptime, self.rate_window), 3) if uptime else 0,
+            'latency_ms': percentiles
+        }
+
+# Minimal HTTP/1.1 server on asyncio streams, CPU work offloaded to a process pool
+class SuitabilityService:
+    def __init__(self, pool, max_body=50 * 2**20):
+        self.pool = pool
+        self.max_body = max_body
+        self.metrics = ServiceMetrics()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > self.max_body:
+                    await self.respond(writer, 413, {'error': 'Request body too large'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, path.split('?', 1)[0], body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/metrics':
+            return 200, self.metrics.snapshot()
+        if path != '/score':
+            return 404, {'error': f'Unknown path {path}'}
+        if method != 'POST':
+            return 405, {'error': 'Use POST with a GeoJSON FeatureCollection'}
+
+        start = time.perf_counter()
+        try:
+            result, count = await asyncio.get_running_loop().run_in_executor(self.pool, score_geojson, body)
+        except ValueError as e:  # Also covers malformed JSON
+            self.metrics.record(time.perf_counter() - start, error=True)
+            return 400, {'error': str(e)}
+        except Exception as e:
+            self.metrics.record(time.perf_counter() - start, error=True)
+            return 500, {'error': str(e)}
+        self.metrics.record(time.perf_counter() - start, parcels=count)
+        return 200, result
+
+    async def respond(self, writer, status, payload, keep_alive=True):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+# No-op task used to start the pool's workers; the short sleep lets every worker pick one up
+def _warm_up():
+    time.sleep(0.05)
+    return os.getpid()
+
+# Start every worker (running init_worker) before the first request arrives
+async def warm_pool(pool, workers):
+    loop = asyncio.get_running_loop()
+    started = set()
+    for _ in range(10):
+        pids = await asyncio.gather(*(loop.run_in_executor(pool, _warm_up) for _ in range(workers)))
+        started.update(pids)
+        if len(started) >= workers:
+            break
+    return len(started)
+
+async def serve(args):
+    context_args = (args.transit, args.boundary, args.reference, args.buffer_distance)
+    workers = args.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=context_args) as pool:
+        started = time.perf_counter()
+        ready = await warm_pool(pool, workers)
+        print(f"Loaded layers in {ready} worker processes ({time.perf_counter() - started:.1f}s)")
+        service = SuitabilityService(pool)
+        server = await asyncio.start_server(service.handle_connection, args.host, args.port)
+        print(f"Suitability service listening on http://{args.host}:{args.port} "
+              f"(POST /score, GET /metrics, GET /health)")
+        async with server:
+            await server.serve_forever()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Long-running land use suitability scoring service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Scoring worker processes")
+    parser.add_argument('--transit', help="Transit stations layer (defaults to the San Francisco sample)")
+    parser.add_argument('--boundary', help="Study area boundary layer (defaults to the San Francisco sample)")
+    parser.add_argument('--reference', help="Reference parcels with pop_density and slope for normalization bounds")
+    parser.add_argument('--buffer-distance', type=float, default=0.005, help="Transit buffer in layer units (~500m in degrees)")
+    return parser.parse_args()
+
+# Main execution
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        print("Suitability service stopped")
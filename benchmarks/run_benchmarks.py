@@ -0,0 +1,279 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import rasterio
+from rasterio.mask import mask
+from shapely.geometry import mapping
+
+import synthetic_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'Landuse Suitability'))
+
+from instrumentation import peak_rss_mb, reset_peak_rss
+
+# Number of features / raster side length per benchmark at each scale
+SCALES = {
+    'small': {'zones': 100, 'buildings': 20_000, 'raster': 1000, 'landuse': 20_000, 'tracts': 400,
+              'cities': 5_000, 'parcels': 5_000, 'scenarios': 500},
+    'medium': {'zones': 1_000, 'buildings': 200_000, 'raster': 4000, 'landuse': 200_000, 'tracts': 2_500,
+               'cities': 50_000, 'parcels': 50_000, 'scenarios': 2_000},
+    'large': {'zones': 5_000, 'buildings': 1_000_000, 'raster': 10_000, 'landuse': 1_000_000, 'tracts': 10_000,
+              'cities': 200_000, 'parcels': 200_000, 'scenarios': 10_000},
+}
+
+# Each benchmark: setup(size, tmpdir) -> inputs (untimed), run(inputs) -> items processed (timed)
+
+# calculating_zonal_statistics.py: mean elevation per zone (local raster instead of Earth Engine)
+def setup_zonal_stats(size, tmpdir):
+    zones = synthetic_data.make_zones(size['zones'], cell_size=size['raster'] * 100 / np.ceil(np.sqrt(size['zones'])))
+    dem = synthetic_data.make_population_raster(f'{tmpdir}/dem.tif', size['raster'], size['raster'])
+    return zones, dem
+
+def run_zonal_stats(inputs):
+    zones, dem = inputs
+    zones['geometry'] = zones['geometry'].apply(lambda geom: geom if geom.is_valid else geom.buffer(0))
+    with rasterio.open(dem) as src:
+        means = [mask(src, [mapping(geom)], crop=True, filled=False)[0].mean() for geom in zones.geometry]
+    zones['mean_elevation'] = means
+    return len(zones)
+
+# choropleth_mapping_of_building_density.py: buildings per boundary via spatial join
+def setup_building_density(size, tmpdir):
+    zones = synthetic_data.make_zones(size['zones'])
+    return zones, synthetic_data.make_buildings(size['buildings'], zones.total_bounds)
+
+def run_building_density(inputs):
+    boundaries, buildings = inputs
+    joined = gpd.sjoin(buildings, boundaries, how='left', predicate='within')
+    building_counts = joined.groupby('index_right').size()
+    boundaries['building_count'] = boundaries.index.map(building_counts).fillna(0)
+    return len(buildings)
+
+# creating_*_population_*_map.py: clip raster to study area, mask and classify
+def setup_raster_clip_classify(size, tmpdir):
+    raster = synthetic_data.make_population_raster(f'{tmpdir}/population.tif', size['raster'], size['raster'])
+    return raster, synthetic_data.make_study_area(size['raster'], size['raster'])
+
+def run_raster_clip_classify(inputs):
+    raster_path, study_area = inputs
+    with rasterio.open(raster_path) as src:
+        geoms = [mapping(geom) for geom in study_area.geometry]
+        clipped_raster, clipped_transform = mask(src, geoms, crop=True, nodata=-9999)
+    clipped_data = np.ma.masked_where(clipped_raster[0] <= -9999, clipped_raster[0])
+    clipped_data = np.ma.masked_invalid(clipped_data)
+    bins = [0, 50, 100, 500, 1000, np.max(clipped_data) + 1]
+    np.digitize(clipped_data, bins, right=True)
+    return clipped_raster[0].size
+
+# france_buffer_cities_map.py: country buffer, cities within it and distance to the border
+def setup_buffer_distance(size, tmpdir):
+    return synthetic_data.make_country_and_cities(size['cities'])
+
+def run_buffer_distance(inputs):
+    country, cities = inputs
+    country_buffer = country.copy()
+    country_buffer['geometry'] = country.geometry.buffer(50_000)
+    within = gpd.sjoin(cities, country_buffer, predicate='within', how='inner')
+    outside = within[within['country_name'] != 'Synthetia'].copy()
+    outside['distance_km'] = outside.geometry.apply(lambda x: country.geometry.distance(x).min() / 1000)
+    return len(cities)
+
+# hot_spot_analysis_using_getis_statistic.py: Queen weights and local Gi*
+def setup_getis_ord(size, tmpdir):
+    return synthetic_data.make_tracts(size['tracts'])
+
+def run_getis_ord(gdf):
+    from libpysal.weights import Queen
+    from esda import G_Local
+
+    gdf['pop_density'] = gdf['POP_EST'] / (gdf.geometry.area / 1e6)
+    w = Queen.from_dataframe(gdf, use_index=False)
+    w.transform = 'r'
+    G_Local(gdf['pop_density'], w, transform='r', star=True)
+    return len(gdf)
+
+# landuse_reclassification_for_a_shapefile.py: map fclass to land use groups
+def setup_reclassification(size, tmpdir):
+    return synthetic_data.make_landuse(size['landuse'])
+
+def run_reclassification(gdf):
+    from landuse_mapping import LANDUSE_MAPPING
+
+    gdf['landuse_group'] = gdf['fclass'].map(LANDUSE_MAPPING)
+    gdf[gdf['landuse_group'].isna()]['fclass'].dropna().unique()
+    return len(gdf)
+
+# generate_suitability_report.py: transit proximity and weighted suitability for parcels
+def setup_suitability(size, tmpdir):
+    return synthetic_data.make_parcels(size['parcels'])
+
+def run_suitability(inputs):
+    from generate_suitability_report import calculate_proximity_to_transit, calculate_suitability
+
+    transit, parcels = inputs
+    parcels = calculate_suitability(calculate_proximity_to_transit(parcels, transit))
+    return len(parcels)
+
+# generate_suitability_report.py: weight-scenario sweep (parcels x scenarios scores)
+def setup_suitability_sweep(size, tmpdir):
+    from generate_suitability_report import calculate_proximity_to_transit, normalize_criteria, generate_weight_scenarios
+
+    transit, parcels = synthetic_data.make_parcels(size['parcels'])
+    parcels = normalize_criteria(calculate_proximity_to_transit(parcels, transit))
+    return parcels, generate_weight_scenarios(size['scenarios'], seed=0)
+
+def run_suitability_sweep(inputs):
+    from generate_suitability_report import sweep_weight_scenarios
+
+    parcels, scenarios = inputs
+    sweep_weight_scenarios(parcels, scenarios)
+    return len(parcels) * scenarios.shape[1]
+
+# generate_suitability_report.py: tiled raster weighted overlay
+def setup_suitability_raster(size, tmpdir):
+    return synthetic_data.make_criterion_rasters(tmpdir, size['raster'], size['raster']), f'{tmpdir}/suitability.tif'
+
+def run_suitability_raster(inputs):
+    from generate_suitability_report import calculate_raster_suitability
+
+    raster_paths, output_path = inputs
+    calculate_raster_suitability(raster_paths, output_path)
+    return size_of_raster(output_path)
+
+def size_of_raster(path):
+    with rasterio.open(path) as src:
+        return src.width * src.height
+
+BENCHMARKS = {
+    'zonal_stats': (setup_zonal_stats, run_zonal_stats, 'zones'),
+    'building_density': (setup_building_density, run_building_density, 'buildings'),
+    'raster_clip_classify': (setup_raster_clip_classify, run_raster_clip_classify, 'pixels'),
+    'buffer_distance': (setup_buffer_distance, run_buffer_distance, 'cities'),
+    'getis_ord': (setup_getis_ord, run_getis_ord, 'tracts'),
+    'reclassification': (setup_reclassification, run_reclassification, 'polygons'),
+    'suitability': (setup_suitability, run_suitability, 'parcels'),
+    'suitability_sweep': (setup_suitability_sweep, run_suitability_sweep, 'parcel-scenarios'),
+    'suitability_raster': (setup_suitability_raster, run_suitability_raster, 'pixels'),
+}
+
+# Run one benchmark in the current (fresh) process
+def run_case(name, scale, repeat):
+    setup, run, unit = BENCHMARKS[name]
+    size = SCALES[scale]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        walls, cpus, peaks = [], [], []
+        for _ in range(repeat):
+            inputs = setup(size, tmpdir)
+            baseline = peak_rss_mb()
+            reset_peak_rss()
+            wall, cpu = time.perf_counter(), time.process_time()
+            items = run(inputs)
+            walls.append(time.perf_counter() - wall)
+            cpus.append(time.process_time() - cpu)
+            peaks.append(peak_rss_mb())
+            del inputs
+
+    wall = statistics.median(walls)
+    peaks = [peak for peak in peaks if peak is not None]  # No readings where memory is not measurable
+    return {
+        'benchmark': name,
+        'scale': scale,
+        'items': items,
+        'unit': unit,
+        'repeat': repeat,
+        'wall_s': round(wall, 4),
+        'wall_min_s': round(min(walls), 4),
+        'cpu_s': round(statistics.median(cpus), 4),
+        'peak_rss_mb': round(max(peaks), 1) if peaks else None,
+        'setup_rss_mb': round(baseline, 1) if baseline is not None else None,
+        'throughput_per_s': round(items / wall, 1) if wall else None
+    }
+
+def run_isolated(name, scale, repeat):
+    # A fresh spawned process per benchmark keeps peak memory readings independent
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_case, name, scale, repeat).result()
+
+def environment_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__,
+                     'geopandas': gpd.__version__, 'rasterio': rasterio.__version__}
+    }
+
+# Print wall-time ratios against a previous results file
+def compare_results(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['benchmark'], r['scale']): r for r in json.load(f)['results'] if 'wall_s' in r}
+    print(f"\nComparison with {baseline_path} (ratio > 1 is slower):")
+    for r in results:
+        previous = baseline.get((r['benchmark'], r['scale']))
+        if previous and 'wall_s' in r and previous['wall_s']:
+            memory = (f"peak RSS x{r['peak_rss_mb'] / previous['peak_rss_mb']:.2f}"
+                      if r['peak_rss_mb'] and previous['peak_rss_mb'] else "peak RSS n/a")
+            print(f"  {r['benchmark']:<22} {r['scale']:<7} wall x{r['wall_s'] / previous['wall_s']:.2f}  {memory}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the core computation of each analysis script on synthetic data.")
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small'])
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark (median reported)")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Previous results JSON to compare against")
+    return parser.parse_args()
+
+def write_results(path, environment, results):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment, 'results': results}, f, indent=2)
+
+# Main execution
+if __name__ == "__main__":
+    args = parse_args()
+    environment = environment_info()
+    results = []
+    for scale in args.scales:
+        for name in args.benchmarks:
+            try:
+                result = run_isolated(name, scale, args.repeat)
+                peak = 'n/a' if result['peak_rss_mb'] is None else f"{result['peak_rss_mb']:.1f}"
+                print(f"{name:<22} {scale:<7} {result['wall_s']:>9.3f}s  {peak:>8} MB  "
+                      f"{result['throughput_per_s']:>14,.0f} {result['unit']}/s")
+            except ImportError as e:
+                result = {'benchmark': name, 'scale': scale, 'skipped': f"missing dependency: {e.name}"}
+                print(f"{name:<22} {scale:<7} skipped ({result['skipped']})")
+            except Exception as e:  # e.g. MemoryError, or BrokenProcessPool if the child was killed
+                result = {'benchmark': name, 'scale': scale, 'error': f"{type(e).__name__}: {e}"}
+                print(f"{name:<22} {scale:<7} failed ({result['error']})")
+            results.append(result)
+            # Rewrite after every benchmark so finished results survive an aborted run
+            write_results(args.output, environment, results)
+
+    print(f"\nResults saved as {args.output}")
+
+    if args.compare:
+        compare_results(results, args.compare)
@@ -0,0 +1,113 @@
+import numpy as np
+import geopandas as gpd
+import rasterio
+from rasterio.transform import from_origin
+from shapely.geometry import Point, box
+
+# Projected CRS used for synthetic layers (metres)
+SYNTHETIC_CRS = "EPSG:3857"
+
+# fclass values seen in OSM land use layers, plus a few the reclassification does not map
+LANDUSE_CLASSES = [
+    'residential', 'commercial', 'retail', 'industrial', 'farmland', 'forest', 'grass',
+    'park', 'reservoir', 'cemetery', 'military', 'quarry', 'railway', 'scrub', 'meadow',
+    'allotments', 'heath', 'orchard', 'vineyard', 'unknown_a', 'unknown_b'
+]
+
+# Square grid of polygons covering an extent; n is rounded to a full grid
+def make_grid_polygons(n, cell_size=1000, origin=(0, 0)):
+    side = int(np.ceil(np.sqrt(n)))
+    cols, rows = np.meshgrid(np.arange(side), np.arange(side))
+    x0 = origin[0] + cols.ravel()[:n] * cell_size
+    y0 = origin[1] + rows.ravel()[:n] * cell_size
+    return [box(x, y, x + cell_size, y + cell_size) for x, y in zip(x0, y0)]
+
+# Administrative zones (as in calculating_zonal_statistics.py / choropleth_mapping_of_building_density.py)
+def make_zones(n, cell_size=1000):
+    return gpd.GeoDataFrame({
+        'County_Nam': [f'Zone {i}' for i in range(n)],
+        'geometry': make_grid_polygons(n, cell_size)
+    }, geometry='geometry', crs=SYNTHETIC_CRS)
+
+# Small rectangular building footprints scattered over the zones' extent
+def make_buildings(n, extent, seed=0):
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = extent
+    x = rng.uniform(minx, maxx, n)
+    y = rng.uniform(miny, maxy, n)
+    w = rng.uniform(5, 30, n)
+    h = rng.uniform(5, 30, n)
+    return gpd.GeoDataFrame(geometry=[box(*b) for b in zip(x, y, x + w, y + h)], crs=SYNTHETIC_CRS)
+
+# Population raster (lognormal counts, -9999 nodata border) written to path
+def make_population_raster(path, width, height, pixel_size=100, seed=0):
+    rng = np.random.default_rng(seed)
+    data = rng.lognormal(mean=4, sigma=1.5, size=(height, width)).astype('float32')
+    data[:, :max(1, width // 50)] = -9999
+    transform = from_origin(0, height * pixel_size, pixel_size, pixel_size)
+    with rasterio.open(path, 'w', driver='GTiff', width=width, height=height, count=1, dtype='float32',
+                       crs=SYNTHETIC_CRS, transform=transform, nodata=-9999, tiled=True,
+                       blockxsize=256, blockysize=256) as dst:
+        dst.write(data, 1)
+    return path
+
+# Study area boundary: a disc inside the raster extent
+def make_study_area(width, height, pixel_size=100):
+    centre = Point(width * pixel_size / 2, height * pixel_size / 2)
+    radius = 0.45 * min(width, height) * pixel_size
+    return gpd.GeoDataFrame({'name': ['Study area']}, geometry=[centre.buffer(radius)], crs=SYNTHETIC_CRS)
+
+# Land use polygons with an 'fclass' column (landuse_reclassification_for_a_shapefile.py)
+def make_landuse(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return gpd.GeoDataFrame({
+        'fclass': rng.choice(LANDUSE_CLASSES, n),
+        'geometry': make_grid_polygons(n, cell_size=200)
+    }, geometry='geometry', crs=SYNTHETIC_CRS)
+
+# Contiguous tracts with population estimates (hot_spot_analysis_using_getis_statistic.py)
+def make_tracts(n, seed=0):
+    rng = np.random.default_rng(seed)
+    tracts = make_zones(n, cell_size=5000)
+    tracts['CONTINENT'] = 'Africa'
+    tracts['POP_EST'] = rng.lognormal(mean=12, sigma=1, size=n).round()
+    return tracts
+
+# Country polygon and city points around it (france_buffer_cities_map.py)
+def make_country_and_cities(n_cities, seed=0):
+    rng = np.random.default_rng(seed)
+    country = gpd.GeoDataFrame({'name': ['Synthetia']},
+                               geometry=[Point(0, 0).buffer(500_000, resolution=64)], crs=SYNTHETIC_CRS)
+    angle = rng.uniform(0, 2 * np.pi, n_cities)
+    radius = rng.uniform(0, 700_000, n_cities)
+    cities = gpd.GeoDataFrame({
+        'city_name': [f'City {i}' for i in range(n_cities)],
+        'country_name': np.where(radius < 500_000, 'Synthetia', 'Neighbouria'),
+        'geometry': gpd.points_from_xy(radius * np.cos(angle), radius * np.sin(angle))
+    }, geometry='geometry', crs=SYNTHETIC_CRS)
+    return country, cities
+
+# Parcels and transit stations in the San Francisco extent (generate_suitability_report.py)
+def make_parcels(n, n_transit=40, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(-122.5176, -122.3567, n)
+    y = rng.uniform(37.7047, 37.8088, n)
+    parcels = gpd.GeoDataFrame({
+        'id': np.arange(1, n + 1),
+        'pop_density': rng.integers(100, 20000, n),
+        'slope': rng.integers(0, 35, n),
+        'geometry': gpd.points_from_xy(x, y).buffer(0.0005, resolution=4)
+    }, geometry='geometry', crs="EPSG:4326")
+    transit = gpd.GeoDataFrame({
+        'name': [f'Station {i}' for i in range(n_transit)],
+        'geometry': gpd.points_from_xy(rng.uniform(-122.5176, -122.3567, n_transit),
+                                       rng.uniform(37.7047, 37.8088, n_transit))
+    }, geometry='geometry', crs="EPSG:4326")
+    return transit, parcels
+
+# Aligned criterion rasters for the raster suitability mode
+def make_criterion_rasters(directory, width, height, seed=0):
+    paths = {}
+    for offset, name in enumerate(['pop_density', 'slope', 'transit_distance']):
+        paths[name] = make_population_raster(f'{directory}/{name}.tif', width, height, seed=seed + offset)
+    return paths
@@ -3,18 +3,24 @@ import ee
 from shapely.geometry import mapping
 import folium
 
+from instrumentation import stage
+
 # Initialize Google Earth Engine
 ee.Initialize()
 
 # Load the vector data (shapefile with administrative boundaries)
 vector_path = 'E:\Freelancing\P_05_6.18.2025\data\shp/county_new.shp'  # Replace with your shapefile path
-zones = gpd.read_file(vector_path)
+with stage('read_file') as s:
+    zones = gpd.read_file(vector_path)
+    s.rows = len(zones)
 
 # Ensure geometries are valid (correct invalid geometries if needed)
 zones['geometry'] = zones['geometry'].apply(lambda geom: geom if geom.is_valid else geom.buffer(0))
 
 # Ensure the CRS is WGS84 (EPSG:4326) for GEE compatibility
-zones = zones.to_crs(epsg=4326)
+with stage('to_crs') as s:
+    zones = zones.to_crs(epsg=4326)
+    s.rows = len(zones)
 
 # Load DEM dataset from Google Earth Engine (SRTM DEM in this case)
 dem = ee.Image("USGS/SRTMGL1_003")  # You can also use "NASA/ASTER_GDEM"
@@ -34,59 +40,62 @@ def get_dem_array(dem_image, region):
 # Initialize a list to store results
 elevation_results = []
 
-# Loop through each administrative zone (polygon)
-for idx, zone in zones.iterrows():
-    # Convert the current zone's geometry to GeoJSON format for Earth Engine
-    aoi_geojson = mapping(zone['geometry'])
+with stage('zonal_statistics') as s:
+    # Loop through each administrative zone (polygon)
+    for idx, zone in zones.iterrows():
+        # Convert the current zone's geometry to GeoJSON format for Earth Engine
+        aoi_geojson = mapping(zone['geometry'])
 
-    # Clip the DEM to the current administrative boundary
-    dem_clipped = dem.clip(ee.Geometry(aoi_geojson))
+        # Clip the DEM to the current administrative boundary
+        dem_clipped = dem.clip(ee.Geometry(aoi_geojson))
 
-    # Get the DEM statistics (mean elevation) for the current zone
-    dem_stats = get_dem_array(dem_clipped, aoi_geojson)
+        # Get the DEM statistics (mean elevation) for the current zone
+        dem_stats = get_dem_array(dem_clipped, aoi_geojson)
 
-    # Extract the mean elevation and append it to the results list
-    mean_elevation = dem_stats.get('elevation', None)
-    if mean_elevation is not None:
-        # Replace 'zone_id' with the correct column name from your shapefile
-        elevation_results.append({
-            'zone_id': zone['County_Nam'],  # Replace 'NAME' with the correct column name
-            'mean_elevation': mean_elevation,
-            'geometry': zone['geometry']  # Keep geometry for mapping
-        })
+        # Extract the mean elevation and append it to the results list
+        mean_elevation = dem_stats.get('elevation', None)
+        if mean_elevation is not None:
+            # Replace 'zone_id' with the correct column name from your shapefile
+            elevation_results.append({
+                'zone_id': zone['County_Nam'],  # Replace 'NAME' with the correct column name
+                'mean_elevation': mean_elevation,
+                'geometry': zone['geometry']  # Keep geometry for mapping
+            })
+    s.rows = len(zones)
 
 # Create a base map using folium (centered around the first zone)
-m = folium.Map(location=[zones.geometry.centroid.y.mean(), zones.geometry.centroid.x.mean()],
-               zoom_start=10)
-
-# Loop through the results to add each zone with its mean elevation to the map
-for result in elevation_results:
-    # Get the geometry (polygon) and mean elevation
-    geo = result['geometry']
-    mean_elevation = result['mean_elevation']
+with stage('render_map'):
+    m = folium.Map(location=[zones.geometry.centroid.y.mean(), zones.geometry.centroid.x.mean()],
+                   zoom_start=10)
+
+    # Loop through the results to add each zone with its mean elevation to the map
+    for result in elevation_results:
+        # Get the geometry (polygon) and mean elevation
+        geo = result['geometry']
+        mean_elevation = result['mean_elevation']
     
-    # Create a popup with larger font size
-    popup_content = f"""
-    <div style="font-size: 18px; font-weight: bold; color: #333;">
-        <strong>Zone: {result['zone_id']}</strong><br>
-        <strong>Mean Elevation: {mean_elevation:.2f} meters</strong>
-    </div>
-    """
+        # Create a popup with larger font size
+        popup_content = f"""
+        <div style="font-size: 18px; font-weight: bold; color: #333;">
+            <strong>Zone: {result['zone_id']}</strong><br>
+            <strong>Mean Elevation: {mean_elevation:.2f} meters</strong>
+        </div>
+        """
     
-    # Add the polygon to the map with the custom popup
-    folium.GeoJson(
-        geo,
-        tooltip=popup_content,  # Show the elevation on hover
-        style_function=lambda x: {
-            'fillColor': 'green' if mean_elevation > 1500 else 'red',  # Style based on elevation
-            'color': 'black',  # Border color
-            'weight': 2,
-            'fillOpacity': 0.4
-        }
-    ).add_to(m)
-
-# Save the map as an HTML file
-m.save('mean_elevation_map.html')
+        # Add the polygon to the map with the custom popup
+        folium.GeoJson(
+            geo,
+            tooltip=popup_content,  # Show the elevation on hover
+            style_function=lambda x: {
+                'fillColor': 'green' if mean_elevation > 1500 else 'red',  # Style based on elevation
+                'color': 'black',  # Border color
+                'weight': 2,
+                'fillOpacity': 0.4
+            }
+        ).add_to(m)
+
+    # Save the map as an HTML file
+    m.save('mean_elevation_map.html')
 
 # Display the map (in Jupyter, you can directly display `m` without saving)
 m
@@ -5,20 +5,28 @@ from rasterio.mask import mask
 import matplotlib.pyplot as plt
 from shapely.geometry import mapping
 
+from instrumentation import stage
+
 # Load the study area shapefile
 study_area_path = "...path/boundary.shp"
-study_area = gpd.read_file(study_area_path)
+with stage('read_file') as s:
+    study_area = gpd.read_file(study_area_path)
+    s.rows = len(study_area)
 
 # Load the WorldPop raster
 raster_path = "...path/raster.tif"
 with rasterio.open(raster_path) as src:
     # Reproject study area if needed
     if study_area.crs != src.crs:
-        study_area = study_area.to_crs(src.crs)
+        with stage('to_crs') as s:
+            study_area = study_area.to_crs(src.crs)
+            s.rows = len(study_area)
 
     # Clip the raster using the geometry
-    geoms = [mapping(geom) for geom in study_area.geometry]
-    clipped_raster, clipped_transform = mask(src, geoms, crop=True)
+    with stage('mask') as s:
+        geoms = [mapping(geom) for geom in study_area.geometry]
+        clipped_raster, clipped_transform = mask(src, geoms, crop=True)
+        s.pixels = clipped_raster[0].size
     clipped_meta = src.meta.copy()
     clipped_meta.update({
         "height": clipped_raster.shape[1],
@@ -27,19 +35,22 @@ with rasterio.open(raster_path) as src:
     })
 
 # Remove invalid values
-clipped_raster = clipped_raster[0]  # Remove band dimension if only one band
-clipped_raster = np.ma.masked_where((clipped_raster <= 0) | (np.isnan(clipped_raster)), clipped_raster)
+with stage('mask_invalid') as s:
+    clipped_raster = clipped_raster[0]  # Remove band dimension if only one band
+    clipped_raster = np.ma.masked_where((clipped_raster <= 0) | (np.isnan(clipped_raster)), clipped_raster)
+    s.pixels = clipped_raster.size
 
 # Display raster with colorbar resized to match plot height
-plt.figure(figsize=(10, 8))
-img = plt.imshow(clipped_raster, cmap='viridis')
-cbar = plt.colorbar(img, shrink=0.5)  # shrink controls colorbar height
-cbar.set_label('Population Count')
-plt.title("Clipped Population Raster (Tehran/Alborz)")
-plt.xlabel("X")
-plt.ylabel("Y")
-plt.tight_layout()
-plt.savefig('population_plot_2000.png', dpi=300, bbox_inches='tight')
+with stage('render_map'):
+    plt.figure(figsize=(10, 8))
+    img = plt.imshow(clipped_raster, cmap='viridis')
+    cbar = plt.colorbar(img, shrink=0.5)  # shrink controls colorbar height
+    cbar.set_label('Population Count')
+    plt.title("Clipped Population Raster (Tehran/Alborz)")
+    plt.xlabel("X")
+    plt.ylabel("Y")
+    plt.tight_layout()
+    plt.savefig('population_plot_2000.png', dpi=300, bbox_inches='tight')
 plt.show()
 
 # Optional: Print basic stats
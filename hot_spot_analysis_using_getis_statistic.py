@@ -3,14 +3,20 @@ import matplotlib.pyplot as plt
 from libpysal.weights import Queen
 from esda import G_Local
 
+from instrumentation import stage
+
 # === Step 1: Load Natural Earth countries shapefile ===
 shapefile_path = 'ne_110m_admin_0_countries.shp'
-gdf = gpd.read_file(shapefile_path)
+with stage('read_file') as s:
+    gdf = gpd.read_file(shapefile_path)
+    s.rows = len(gdf)
 
 # Filter for Africa
 gdf = gdf[gdf['CONTINENT'] == 'Africa']
 
-gdf = gdf.to_crs("EPSG:6933")  # Equal-area projection for Africa
+with stage('to_crs') as s:
+    gdf = gdf.to_crs("EPSG:6933")  # Equal-area projection for Africa
+    s.rows = len(gdf)
 gdf['area_m2'] = gdf['geometry'].area
 gdf['area_km2'] = gdf['area_m2'] / 1e6
 
@@ -18,11 +24,15 @@ gdf['area_km2'] = gdf['area_m2'] / 1e6
 gdf['pop_density'] = gdf['POP_EST'] / gdf['area_km2']  # people per km²
 
 # === Step 2: Spatial Weights Matrix (Queen contiguity) ===
-w = Queen.from_dataframe(gdf)
-w.transform = 'r'
+with stage('queen_weights') as s:
+    w = Queen.from_dataframe(gdf)
+    w.transform = 'r'
+    s.rows = len(gdf)
 
 # === Step 3: Local G* statistic
-g_local = G_Local(gdf['pop_density'], w, transform='r', star=True)
+with stage('G_Local') as s:
+    g_local = G_Local(gdf['pop_density'], w, transform='r', star=True)
+    s.rows = len(gdf)
 
 # Add results
 gdf['GiZScore'] = g_local.Zs
@@ -42,26 +52,27 @@ gdf['Gi_Classification'] = [classify_gi(z, p) for z, p in zip(gdf['GiZScore'], g
 # === Step 4: Plot with Legend
 import matplotlib.patches as mpatches
 
-fig, ax = plt.subplots(1, 1, figsize=(12, 8))
+with stage('render_map'):
+    fig, ax = plt.subplots(1, 1, figsize=(12, 8))
 
-# Define classification colors
-colors = {'Hotspot': 'red', 'Coldspot': 'blue', 'Not Significant': 'lightgrey'}
+    # Define classification colors
+    colors = {'Hotspot': 'red', 'Coldspot': 'blue', 'Not Significant': 'lightgrey'}
 
-# Plot the map
-gdf.plot(
-    column='Gi_Classification',
-    ax=ax,
-    color=gdf['Gi_Classification'].map(colors),
-    edgecolor='black',
-    linewidth=0.5
-)
+    # Plot the map
+    gdf.plot(
+        column='Gi_Classification',
+        ax=ax,
+        color=gdf['Gi_Classification'].map(colors),
+        edgecolor='black',
+        linewidth=0.5
+    )
 
-# Manually create legend
-legend_patches = [mpatches.Patch(color=clr, label=lbl) for lbl, clr in colors.items()]
-ax.legend(handles=legend_patches, title="Gi* Classification", loc='lower left')
+    # Manually create legend
+    legend_patches = [mpatches.Patch(color=clr, label=lbl) for lbl, clr in colors.items()]
+    ax.legend(handles=legend_patches, title="Gi* Classification", loc='lower left')
 
-# Final formatting
-plt.title('Hotspot Analysis (Getis-Ord Gi*) on Population Density in Africa')
-plt.axis('off')
-plt.tight_layout()
+    # Final formatting
+    plt.title('Hotspot Analysis (Getis-Ord Gi*) on Population Density in Africa')
+    plt.axis('off')
+    plt.tight_layout()
 plt.show()
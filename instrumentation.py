@@ -0,0 +1,187 @@
+import atexit
+import cProfile
+import json
+import os
+import sys
+import time
+
+# Stage-level timing and memory instrumentation for the analysis scripts.
+#
+# Wrap each step of a script in a stage and report rows or pixels processed:
+#
+#     with stage('sjoin') as s:
+#         joined = gpd.sjoin(buildings, boundaries)
+#         s.rows = len(joined)
+#
+# Disabled unless PIPELINE_INSTRUMENT=1 (or configure(enabled=True)); a disabled
+# stage is a shared no-op context manager. When enabled, a JSON run report and a
+# console summary are written at exit. PIPELINE_PROFILE_STAGE=<name> also dumps a
+# cProfile of that stage to <name>.prof.
+
+_config = {
+    'enabled': os.environ.get('PIPELINE_INSTRUMENT', '') not in ('', '0'),
+    'profile_stage': os.environ.get('PIPELINE_PROFILE_STAGE') or None,
+    'report_path': os.environ.get('PIPELINE_REPORT') or None
+}
+_run_start = time.perf_counter()
+_records = []
+_stack = []
+_report_registered = False
+
+# Read a /proc/self/status memory field in MB (Linux only)
+def _proc_status_mb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+# Peak resident memory of this process in MB (VmHWM on Linux, ru_maxrss on other POSIX systems,
+# None where neither exists, e.g. Windows)
+def peak_rss_mb():
+    peak = _proc_status_mb('VmHWM:')
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB on Linux
+
+# Current resident memory in MB (falls back to the peak where VmRSS is unavailable, None if neither is)
+def current_rss_mb():
+    current = _proc_status_mb('VmRSS:')
+    return current if current is not None else peak_rss_mb()
+
+# Reset the peak so the next reading covers only what follows (Linux only)
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+class _NoOpStage:
+    rows = None
+    pixels = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+_NO_OP = _NoOpStage()
+
+class Stage:
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+        self.pixels = None
+        self._profiler = None
+
+    # Keep the highest peak seen so far (readings are None where memory is not measurable)
+    def _observe_peak(self, peak):
+        if peak is not None and (self.observed_peak is None or peak > self.observed_peak):
+            self.observed_peak = peak
+
+    def __enter__(self):
+        # Hand the peak so far to the enclosing stage before resetting it for this one
+        if _stack:
+            _stack[-1]._observe_peak(peak_rss_mb())
+        reset_peak_rss()
+        self.depth = len(_stack)
+        self.rss_start = current_rss_mb()
+        self.observed_peak = None
+        _stack.append(self)
+        if self.name == _config['profile_stage']:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(f'{self.name}.prof')
+        _stack.pop()
+
+        self._observe_peak(peak_rss_mb())
+        peak = self.observed_peak
+        if _stack:
+            _stack[-1]._observe_peak(peak)
+        processed = self.rows if self.rows is not None else self.pixels
+        _records.append({
+            'stage': self.name,
+            'depth': self.depth,
+            'start_s': round(self.wall_start - _run_start, 4),
+            'wall_s': round(wall, 4),
+            'cpu_s': round(cpu, 4),
+            'peak_rss_mb': None if peak is None else round(peak, 1),
+            'peak_rss_delta_mb': None if peak is None or self.rss_start is None else round(max(0.0, peak - self.rss_start), 1),
+            'rows': self.rows,
+            'pixels': self.pixels,
+            'throughput_per_s': round(processed / wall, 1) if processed is not None and wall else None,
+            'failed': exc_type is not None
+        })
+        return False
+
+# Context manager for one pipeline step; no-op when instrumentation is disabled
+def stage(name):
+    if not _config['enabled']:
+        return _NO_OP
+    global _report_registered
+    if not _report_registered:
+        atexit.register(write_run_report)
+        _report_registered = True
+    return Stage(name)
+
+# Override the environment defaults from code
+def configure(enabled=None, profile_stage=None, report_path=None):
+    if enabled is not None:
+        _config['enabled'] = enabled
+    if profile_stage is not None:
+        _config['profile_stage'] = profile_stage
+    if report_path is not None:
+        _config['report_path'] = report_path
+
+# Recorded stages in start order
+def get_records():
+    return sorted(_records, key=lambda r: r['start_s'])
+
+# Write the JSON run report and print a per-stage summary
+def write_run_report(path=None):
+    if not _records:
+        return None
+    script = os.path.splitext(os.path.basename(sys.argv[0] or 'pipeline'))[0]
+    path = path or _config['report_path'] or f'{script}_run_report.json'
+    report = {
+        'script': script,
+        'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'total_wall_s': round(sum(r['wall_s'] for r in _records if r['depth'] == 0), 4),
+        'stages': get_records()
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nRun report ({script}):")
+    print(f"  {'stage':<34}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}{'+MB':>8}{'items':>12}")
+    for r in get_records():
+        items = r['rows'] if r['rows'] is not None else r['pixels']
+        peak = '-' if r['peak_rss_mb'] is None else f"{r['peak_rss_mb']:.1f}"
+        delta = '-' if r['peak_rss_delta_mb'] is None else f"{r['peak_rss_delta_mb']:.1f}"
+        print(f"  {'  ' * r['depth'] + r['stage']:<34}{r['wall_s']:>10.3f}{r['cpu_s']:>10.3f}"
+              f"{peak:>10}{delta:>8}{'' if items is None else items:>12}")
+    print(f"  Report saved as {path}")
+    return path
@@ -0,0 +1,75 @@
+# fclass -> land use group, shared by landuse_reclassification_for_a_shapefile.py and the benchmarks
+LANDUSE_MAPPING = {
+    # Residential and urban
+    'residential': 'Residential',
+    'suburb': 'Residential',
+    'neighbourhood': 'Residential',
+
+    # Commercial and retail
+    'commercial': 'Commercial',
+    'retail': 'Commercial',
+    'marketplace': 'Commercial',
+
+    # Industrial
+    'industrial': 'Industrial',
+    'warehouse': 'Industrial',
+
+    # Public/institutional/military
+    'military': 'Military',
+    'school': 'Public Facility',
+    'university': 'Public Facility',
+    'hospital': 'Public Facility',
+    'cemetery': 'Cemetery',
+
+    # Agricultural
+    'farmland': 'Agricultural',
+    'farmyard': 'Agricultural',
+    'orchard': 'Agricultural',
+    'vineyard': 'Agricultural',
+    'allotments': 'Agricultural',
+    'greenhouse_horticulture': 'Agricultural',
+    'plant_nursery': 'Agricultural',
+
+    # Natural/vegetated
+    'grass': 'Natural',
+    'forest': 'Natural',
+    'scrub': 'Natural',
+    'meadow': 'Natural',
+    'heath': 'Natural',
+    'fell': 'Natural',
+    'moor': 'Natural',
+    'wood': 'Natural',
+    'nature_reserve': 'Natural',
+
+    # Water-related
+    'reservoir': 'Water',
+    'basin': 'Water',
+    'wetland': 'Water',
+    'lake': 'Water',
+    'pond': 'Water',
+
+    # Recreational / Green urban areas
+    'park': 'Recreational',
+    'recreation_ground': 'Recreational',
+    'pitch': 'Recreational',
+    'sports_centre': 'Recreational',
+    'stadium': 'Recreational',
+    'golf_course': 'Recreational',
+    'playground': 'Recreational',
+
+    # Extractive or industrial
+    'quarry': 'Extractive',
+    'landfill': 'Extractive',
+    'brownfield': 'Extractive',
+    'construction': 'Construction',
+
+    # Transport-related
+    'railway': 'Transport',
+    'railway_yard': 'Transport',
+    'port': 'Transport',
+    'aerodrome': 'Transport',
+
+    # Others
+    'religious': 'Religious',
+    'place_of_worship': 'Religious'
+}